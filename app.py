@@ -1,21 +1,68 @@
 import os
+# Must be set before huggingface_hub is imported: parallel Rust downloader for large weight files
+os.environ.setdefault("HF_HUB_ENABLE_HF_TRANSFER", "1")
+import gzip
+import hashlib
 import shutil
 import asyncio
 import time
-from typing import Dict, List
-from fastapi import FastAPI, UploadFile, File, Form, BackgroundTasks
-from fastapi.responses import JSONResponse, StreamingResponse, FileResponse
+import threading
+import aiofiles
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Set, Tuple
+from fastapi import FastAPI, UploadFile, File, Form, BackgroundTasks, Request
+from fastapi.responses import ORJSONResponse, StreamingResponse, FileResponse, Response
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
-from huggingface_hub import snapshot_download
+from urllib.parse import quote
+from huggingface_hub import scan_cache_dir, snapshot_download
+from huggingface_hub.constants import HF_HUB_CACHE
+from huggingface_hub.utils import CacheNotFound, LocalEntryNotFoundError
+from audio_utils import drop_mel_cache, iter_transcribe_batched, mel_cache
+from srt_utils import write_srt
+from task_utils import TaskStore, iter_ndjson
+import numpy as np
+import mlx.core as mx
 import mlx_whisper
+from mlx_whisper.audio import SAMPLE_RATE
+from mlx_whisper.transcribe import ModelHolder
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 
-# In-memory status storage: maps task_id to a list of log messages
-transcription_logs: Dict[str, List[str]] = {}
-transcription_progress: Dict[str, float] = {} # 0 to 100
-transcription_results: Dict[str, List[Dict]] = {} # Maps task_id to segment list
+# Inference is serialized on a single worker so concurrent uploads don't fight over the GPU.
+# Downloads are network-bound and get their own pool.
+INFERENCE_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mlx")
+DOWNLOAD_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="download")
+# In-flight downloads per model key: (task_id, future). Concurrent requests share one download.
+DOWNLOAD_FUTURES: Dict[str, Tuple[str, asyncio.Future]] = {}
+MAX_QUEUE_DEPTH = 4 # Reject new transcriptions with 429 beyond this many queued/running jobs
+JOB_QUEUE_DEPTH = 0 # Jobs submitted to INFERENCE_POOL that haven't finished yet (event loop only)
+
+DEFAULT_MODEL_KEY = "large-v3-turbo-4bit" # Preloaded at startup if present on disk
+
+# Files longer than this are split on silence and decoded in parallel batches
+BATCHED_MIN_DURATION = 60 # seconds
+INFERENCE_BATCH_SIZE = 8
+
+UPLOAD_CHUNK_SIZE = 1 << 20 # 1 MiB
+# Decoded uploads, shared by queued jobs on the same audio and deleted once the last of them finishes
+PCM_FILES: Dict[str, List] = {} # audio hash -> [pcm path, queued/running jobs reading it]
+PCM_FILES_LOCK = threading.Lock()
+CLEANUP_RETRY_DELAYS = (0.02, 0.05, 0.1) # seconds between unlink retries, ~170ms worst case
+GZIP_MIN_SIZE = 512 # bytes; smaller SRT files are sent as-is
+
+# Bounds for in-memory task state
+MAX_TASKS = 128 # Least recently updated tasks are evicted beyond this
+TASK_TTL = 60 * 60 # seconds; tasks are dropped by housekeeping this long after they finish
+HOUSEKEEPING_INTERVAL = 5 * 60 # seconds
+
+task_store = TaskStore(MAX_TASKS)
+
+# SSE subscribers per task: each is (event loop, queue) so worker threads can push safely
+transcription_events: Dict[str, Set[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+
+MODELS_DIR = Path("models").resolve() # Legacy per-model folders from older versions
+UPLOAD_DIR = Path.cwd() / "uploads"
 
 MODELS_METADATA = {
     "tiny": {
@@ -64,310 +111,555 @@ MODELS_METADATA = {
         "description": "Memory efficient version. Best for heavy loads on M2 Air.",
         "min_ram": "4GB",
         "speed": "Fast",
-        "accuracy": "High"
+        "accuracy": "High",
+        "preferred": True # Quantized weights: decoding is memory-bandwidth bound on Apple Silicon
     }
 }
 
-def format_timestamp(seconds):
-    """Converts seconds to HH:MM:SS,mmm format."""
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    secs = int(seconds % 60)
-    millis = int((seconds % 1) * 1000)
-    return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
+# Derived per-model fields, computed once instead of on every request (server-side only, not sent by /models)
+INTERNAL_MODEL_FIELDS = ("folder", "local_path")
+for _meta in MODELS_METADATA.values():
+    _meta["folder"] = _meta["id"].split("/")[-1] # Legacy ./models/<folder> name
+    _meta["local_path"] = None # Resolved on-disk snapshot, filled in on first lookup
+MODELS_BY_ID = {meta["id"]: meta for meta in MODELS_METADATA.values()}
 
-def write_srt(segments, output_path):
-    """Writes transcription segments to an SRT file using smart chunking."""
-    
-    # Constants for smart chunking
-    MAX_CHARS = 42
-    MAX_WORDS = 8
-    PAUSE_THRESHOLD = 0.5  # seconds
-
-    # Flatten all words from all segments into a single stream for continuous processing
-    all_words = []
-    for segment in segments:
-        if "words" in segment:
-            all_words.extend(segment["words"])
-    
-    with open(output_path, "w", encoding="utf-8") as f:
-        caption_counter = 1
-        
-        # Fallback to segment-based if no word timestamps found
-        if not all_words:
-            for i, segment in enumerate(segments, start=1):
-                start = format_timestamp(segment["start"])
-                end = format_timestamp(segment["end"])
-                text = segment["text"].strip()
-                f.write(f"{i}\n{start} --> {end}\n{text}\n\n")
-            return
-
-        current_chunk = []
-        
-        for i, word_info in enumerate(all_words):
-            current_chunk.append(word_info)
-            should_break = False
-            
-            # 1. Check for natural pause (look ahead to next word)
-            if i < len(all_words) - 1:
-                next_word = all_words[i+1]
-                if next_word["start"] - word_info["end"] > PAUSE_THRESHOLD:
-                    should_break = True
-            
-            # 2. Check for punctuation
-            word_text = word_info["word"].strip()
-            if word_text and word_text[-1] in ".?!":
-                should_break = True
-                
-            # 3. Check for max length (character count)
-            current_text = "".join([w["word"] for w in current_chunk]).strip()
-            if len(current_text) > MAX_CHARS:
-                should_break = True
-                
-            # 4. Check for max words
-            if len(current_chunk) >= MAX_WORDS:
-                should_break = True
-            
-            if should_break and current_chunk:
-                start_time = current_chunk[0]["start"]
-                end_time = current_chunk[-1]["end"]
-                text = "".join([w["word"] for w in current_chunk]).strip()
-                
-                f.write(f"{caption_counter}\n")
-                f.write(f"{format_timestamp(start_time)} --> {format_timestamp(end_time)}\n")
-                f.write(f"{text}\n\n")
-                caption_counter += 1
-                current_chunk = []
-        
-        # Flush remaining words in buffer
-        if current_chunk:
-            start_time = current_chunk[0]["start"]
-            end_time = current_chunk[-1]["end"]
-            text = "".join([w["word"] for w in current_chunk]).strip()
-            f.write(f"{caption_counter}\n")
-            f.write(f"{format_timestamp(start_time)} --> {format_timestamp(end_time)}\n")
-            f.write(f"{text}\n\n")
+def get_cached_model(model_path: str):
+    """Returns the model for model_path from mlx_whisper's ModelHolder, which keeps the last loaded one.
+
+    Only called from the inference worker, so no locking is needed. The batched path needs the
+    model object itself; mlx_whisper.transcribe picks up the same instance through ModelHolder.
+    """
+    if ModelHolder.model_path != model_path:
+        # Drop the old weights before loading so two large models never sit in memory at once
+        ModelHolder.model = None
+    return ModelHolder.get_model(model_path, mx.float16)
+
+def publish_event(task_id: str, kind: str, payload=None):
+    """Wakes up every SSE subscriber of a task. Safe to call from any thread."""
+    for loop, queue in list(transcription_events.get(task_id, ())):
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, (kind, payload))
+        except RuntimeError:
+            # Subscriber's loop is already closed
+            pass
 
 def add_log(task_id: str, message: str):
     timestamp = time.strftime("%H:%M:%S")
     log_entry = f"[{timestamp}] {message}"
-    if task_id not in transcription_logs:
-        transcription_logs[task_id] = []
-    transcription_logs[task_id].append(log_entry)
+    task_store.touch(task_id)
+    # Keep the full list for late joiners, then notify live subscribers
+    task_store.logs[task_id].append(log_entry)
+    publish_event(task_id, "log", log_entry)
     print(f"TASK {task_id}: {message}")
 
-def run_transcription_task(file_path: str, model_id: str, task_id: str):
+def set_progress(task_id: str, progress: float):
+    task_store.touch(task_id)
+    task_store.progress[task_id] = progress
+    publish_event(task_id, "progress", progress)
+
+def finish_task(task_id: str):
+    """Signals subscribers that no more events will follow for this task."""
+    task_store.mark_finished(task_id)
+    publish_event(task_id, "done")
+
+def claim_pcm(audio_hash: str, pcm_path: Optional[str] = None) -> Optional[str]:
+    """Adds a job to the decoded upload for audio_hash, registering pcm_path if none exists yet.
+
+    Returns the PCM file the job should read, or None if the audio still has to be decoded.
+    """
+    with PCM_FILES_LOCK:
+        entry = PCM_FILES.get(audio_hash)
+        if entry is None:
+            if pcm_path is not None:
+                PCM_FILES[audio_hash] = [pcm_path, 1]
+            return pcm_path
+        entry[1] += 1
+        return entry[0]
+
+def release_pcm(audio_hash: str) -> Optional[str]:
+    """Drops a job's claim on the decoded upload. Returns its path once no queued job needs it anymore."""
+    with PCM_FILES_LOCK:
+        entry = PCM_FILES[audio_hash]
+        entry[1] -= 1
+        if entry[1]:
+            return None
+        del PCM_FILES[audio_hash]
+        return entry[0]
+
+def remove_with_retry(path: str) -> Optional[OSError]:
+    """Deletes path, retrying briefly if a handle is still being released. Returns the last error, if any."""
+    error = None
+    for delay in (0, *CLEANUP_RETRY_DELAYS):
+        time.sleep(delay)
+        try:
+            os.unlink(path)
+            return None
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            error = e
+    return error
+
+def cleanup_source(task_id: str, audio_hash: str):
+    """Deletes the decoded upload and its cached log-mel if this was the last queued job reading it."""
+    file_path = release_pcm(audio_hash)
+    if file_path is None:
+        add_log(task_id, "Keeping decoded audio for queued jobs on the same file")
+        return
+    drop_mel_cache(audio_hash)
+    # np.fromfile has already closed it
+    print(f"DEBUG: Attempting to delete {file_path}")
+    cleanup_error = remove_with_retry(file_path)
+    if cleanup_error is None:
+        print(f"DEBUG: Successfully deleted {file_path}")
+        add_log(task_id, f"Cleaned up source file: {os.path.basename(file_path)}")
+    else:
+        print(f"DEBUG: Deletion error: {cleanup_error}")
+        add_log(task_id, f"WARNING: Failed to delete source file: {str(cleanup_error)}")
+
+def _collect_into(stream, sink: List):
+    """Passes items through while appending each one to sink."""
+    for item in stream:
+        sink.append(item)
+        yield item
+
+def run_transcription_task(pcm_path: str, model_id: str, task_id: str, output_path: str, audio_hash: str):
+    """Transcribes a raw float32 PCM upload (see convert_to_pcm) and writes the SRT to output_path."""
+    released = False
     try:
         add_log(task_id, f"Initializing transcription with model: {model_id}")
-        transcription_progress[task_id] = 5
+        set_progress(task_id, 5)
         
-        # Local model directory storage logic
-        models_dir = Path("models").absolute()
-        models_dir.mkdir(exist_ok=True)
+        local_model_path = find_local_model(model_id)
         
-        # Extract model folder name
-        model_folder_name = model_id.split("/")[-1]
-        local_model_path = models_dir / model_folder_name
-        
-        if not local_model_path.exists() or not any(local_model_path.iterdir()):
-            add_log(task_id, f"Model not found in {local_model_path}. Starting download from Hugging Face...")
+        if local_model_path is None:
+            add_log(task_id, f"Model {model_id} not found locally. Starting download from Hugging Face...")
             add_log(task_id, "This may take a while depending on your internet speed (Large models are ~1.6GB).")
-            transcription_progress[task_id] = 10
+            set_progress(task_id, 10)
             
             try:
-                # Download to local directory
-                snapshot_download(
-                    repo_id=model_id, 
-                    local_dir=local_model_path,
-                    local_dir_use_symlinks=False
-                )
+                # Download into the shared Hugging Face cache
+                local_model_path = snapshot_download(repo_id=model_id)
                 add_log(task_id, "Download complete!")
             except Exception as download_error:
                 add_log(task_id, f"Download failed: {str(download_error)}. Attempting to use default cache...")
-                # If download fails, we let it try the default behavior
+                # If download fails, let mlx_whisper resolve the repo id itself
+                local_model_path = model_id
         else:
             add_log(task_id, f"Using local model found at: {local_model_path}")
 
-        transcription_progress[task_id] = 20
-        add_log(task_id, "Loading model into memory... (M2 Optimized)")
-        add_log(task_id, "TIP: Initial load may be slow. Subsequent calls will be faster.")
+        set_progress(task_id, 20)
+        if ModelHolder.model_path == local_model_path and ModelHolder.model is not None:
+            add_log(task_id, "Loading model into memory... (already cached, skipping)")
+        else:
+            add_log(task_id, "Loading model into memory... (M2 Optimized)")
+            add_log(task_id, "TIP: Initial load may be slow. Subsequent calls will be faster.")
+        model = get_cached_model(local_model_path)
         
-        output_path = os.path.splitext(file_path)[0] + ".srt"
-        transcription_progress[task_id] = 30
+        set_progress(task_id, 30)
+        
+        # Uploads arrive already converted to raw 16kHz mono float32, no container decode needed
+        audio = mx.array(np.fromfile(pcm_path, dtype=np.float32))
+        audio_duration = audio.shape[0] / SAMPLE_RATE
         
         add_log(task_id, "Model loaded. Starting inference on Apple Silicon GPU...")
-        # Point mlx_whisper to the local model folder, enable word timestamps for granular sync
-        result = mlx_whisper.transcribe(
-            file_path, 
-            path_or_hf_repo=str(local_model_path),
-            word_timestamps=True
-        )
-        transcription_progress[task_id] = 80
+        if audio_duration > BATCHED_MIN_DURATION:
+            add_log(task_id, f"Long audio ({audio_duration:.0f}s): splitting on silence for batched inference...")
+            def on_batch(done, total):
+                set_progress(task_id, 30 + 50 * done / total)
+            # Segments flow into the SRT writer batch by batch, overlapping decode with disk writes
+            segment_stream = iter_transcribe_batched(
+                audio,
+                model,
+                batch_size=INFERENCE_BATCH_SIZE,
+                word_timestamps=True,
+                progress_callback=on_batch,
+                audio_hash=audio_hash
+            )
+        else:
+            # Point mlx_whisper to the local model folder, enable word timestamps for granular sync
+            with mel_cache(audio_hash):
+                result = mlx_whisper.transcribe(
+                    audio, 
+                    path_or_hf_repo=local_model_path,
+                    word_timestamps=True
+                )
+            segment_stream = result["segments"]
+            set_progress(task_id, 80)
+            add_log(task_id, "Inference complete. Formatting SRT file...")
         
-        add_log(task_id, "Inference complete. Formatting SRT file...")
-        write_srt(result["segments"], output_path)
-        transcription_progress[task_id] = 100
+        # /results needs every segment, so the full list is still held; streaming only overlaps decode and writes
+        segments: List[Dict] = []
+        write_srt(_collect_into(segment_stream, segments), output_path)
+        set_progress(task_id, 100)
         
+        # Store results first: the client fetches /results as soon as it sees SUCCESS
+        task_store.results[task_id] = segments
         add_log(task_id, f"SUCCESS: Generated {os.path.basename(output_path)}")
-        transcription_results[task_id] = result["segments"]
         
-        # Auto-cleanup: Delete the original uploaded file
-        time.sleep(1) # Wait for file handles to release
-        try:
-            print(f"DEBUG: Attempting to delete {file_path}")
-            if os.path.exists(file_path):
-                os.remove(file_path)
-                print(f"DEBUG: Successfully deleted {file_path}")
-                add_log(task_id, f"Cleaned up source file: {os.path.basename(file_path)}")
-            else:
-                print(f"DEBUG: File not found for deletion: {file_path}")
-        except Exception as cleanup_error:
-            print(f"DEBUG: Deletion error: {cleanup_error}")
-            add_log(task_id, f"WARNING: Failed to delete source file: {str(cleanup_error)}")
+        # Auto-cleanup: Delete the decoded upload
+        released = True
+        cleanup_source(task_id, audio_hash)
 
         add_log(task_id, "Done!")
+        finish_task(task_id)
         
     except BaseException as e:
+        # Failed jobs must release the decoded upload too, or it stays on disk
+        if not released:
+            cleanup_source(task_id, audio_hash)
         add_log(task_id, f"ERROR: {str(e)}")
-        transcription_progress[task_id] = -1 # Indicate error
+        set_progress(task_id, -1) # Indicate error
+        finish_task(task_id)
         # Re-raise if it's a critical system exit/interrupt, though usually we want to log it first
         if isinstance(e, (KeyboardInterrupt, SystemExit)):
             raise e
 
+def warmup_default_model():
+    model_id = MODELS_METADATA[DEFAULT_MODEL_KEY]["id"]
+    local_model_path = find_local_model(model_id)
+    if local_model_path is None:
+        print(f"Skipping warmup: {model_id} is not downloaded")
+        return
+    try:
+        get_cached_model(local_model_path)
+        print(f"Warmed up {model_id}")
+    except Exception as e:
+        print(f"Warmup failed for {model_id}: {e}")
+
+@app.on_event("startup")
+async def preload_default_model():
+    # Run on the inference worker so the load is serialized with incoming jobs
+    asyncio.get_running_loop().run_in_executor(INFERENCE_POOL, warmup_default_model)
+
+async def housekeeping_loop():
+    while True:
+        await asyncio.sleep(HOUSEKEEPING_INTERVAL)
+        removed = task_store.expire(TASK_TTL)
+        if removed:
+            print(f"Housekeeping: dropped {removed} finished task(s)")
+
+@app.on_event("startup")
+async def start_housekeeping():
+    # Keep a reference so the task isn't garbage collected
+    app.state.housekeeping_task = asyncio.create_task(housekeeping_loop())
+
+def _job_finished(_future):
+    global JOB_QUEUE_DEPTH
+    JOB_QUEUE_DEPTH -= 1
+
+async def convert_to_pcm(src_path: str, pcm_path: str) -> Optional[str]:
+    """Converts any ffmpeg-readable file to raw 16kHz mono float32. Returns an error message on failure."""
+    try:
+        process = await asyncio.create_subprocess_exec(
+            "ffmpeg", "-nostdin", "-loglevel", "error", "-y",
+            "-i", src_path,
+            "-ac", "1", "-ar", str(SAMPLE_RATE), "-f", "f32le", pcm_path,
+            stderr=asyncio.subprocess.PIPE
+        )
+    except FileNotFoundError:
+        return "ffmpeg is not installed"
+    _, stderr = await process.communicate()
+    if process.returncode != 0:
+        return stderr.decode(errors="replace").strip() or f"ffmpeg exited with code {process.returncode}"
+    return None
+
 @app.post("/transcribe")
 async def transcribe(
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     model: str = Form(...)
 ):
-    upload_dir = os.path.join(os.getcwd(), "uploads")
-    os.makedirs(upload_dir, exist_ok=True)
-    
-    file_path = os.path.join(upload_dir, file.filename)
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-    
-    task_id = f"{file.filename}_{int(time.time())}"
-    transcription_logs[task_id] = []
-    transcription_progress[task_id] = 0
-    
-    add_log(task_id, f"Received file: {file.filename}")
-    background_tasks.add_task(run_transcription_task, file_path, model, task_id)
+    global JOB_QUEUE_DEPTH
+    if JOB_QUEUE_DEPTH >= MAX_QUEUE_DEPTH:
+        return ORJSONResponse(
+            {"error": f"Server busy: {JOB_QUEUE_DEPTH} transcriptions already queued. Try again later."},
+            status_code=429
+        )
+
+    # Reserve the slot before the first await, otherwise concurrent uploads all pass the check above
+    JOB_QUEUE_DEPTH += 1
+    claimed = False
+    submitted = False
+    try:
+        UPLOAD_DIR.mkdir(exist_ok=True)
+        
+        file_path = str(UPLOAD_DIR / file.filename)
+        # Stream to disk without blocking the event loop so SSE clients keep flowing
+        # Hash while streaming so queued jobs on the same audio can share the decoded PCM and log-mel
+        hasher = hashlib.blake2b(digest_size=16)
+        async with aiofiles.open(file_path, "wb") as buffer:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                hasher.update(chunk)
+                await buffer.write(chunk)
+        audio_hash = hasher.hexdigest()
+        
+        # Decode the container once at ingest; queued jobs on the same audio share the raw samples
+        pcm_path = claim_pcm(audio_hash)
+        reused = pcm_path is not None
+        if not reused:
+            # Unique name: a finished job may still be deleting an older decode of the same audio
+            new_pcm_path = str(UPLOAD_DIR / f"{audio_hash}.{time.time_ns()}.pcm")
+            convert_error = await convert_to_pcm(file_path, new_pcm_path)
+            if convert_error is not None:
+                os.remove(file_path)
+                if os.path.exists(new_pcm_path):
+                    os.remove(new_pcm_path)
+                return ORJSONResponse({"error": f"Could not decode audio: {convert_error}"}, status_code=400)
+            pcm_path = claim_pcm(audio_hash, new_pcm_path)
+            if pcm_path != new_pcm_path:
+                # A concurrent upload of the same audio finished decoding first
+                os.remove(new_pcm_path)
+        claimed = True
+        # The original upload isn't needed past this point
+        os.remove(file_path)
+        
+        task_id = f"{file.filename}_{int(time.time())}"
+        task_store.touch(task_id)
+        set_progress(task_id, 0)
+        
+        add_log(task_id, f"Received file: {file.filename}")
+        if reused:
+            add_log(task_id, "Reusing decoded audio from a queued job on the same file")
+        if JOB_QUEUE_DEPTH > 1:
+            add_log(task_id, f"Queued behind {JOB_QUEUE_DEPTH - 1} other job(s)...")
+
+        output_path = os.path.splitext(file_path)[0] + ".srt"
+        future = asyncio.get_running_loop().run_in_executor(
+            INFERENCE_POOL, run_transcription_task, pcm_path, model, task_id, output_path, audio_hash
+        )
+        # From here on the worker releases the PCM and _job_finished the slot
+        future.add_done_callback(_job_finished)
+        submitted = True
+    finally:
+        if not submitted:
+            JOB_QUEUE_DEPTH -= 1
+            if claimed and (unused := release_pcm(audio_hash)) is not None:
+                os.remove(unused)
     
     return {"task_id": task_id, "message": "Transcription started"}
 
 @app.get("/status/{task_id}")
 async def get_status(task_id: str):
     async def event_generator():
+        # Subscribe before replaying history so no event can slip in between
+        queue: asyncio.Queue = asyncio.Queue()
+        subscriber = (asyncio.get_running_loop(), queue)
+        transcription_events.setdefault(task_id, set()).add(subscriber)
         sent_logs_count = 0
-        while True:
-            logs = transcription_logs.get(task_id, [])
-            # Send only new logs
-            if len(logs) > sent_logs_count:
-                for i in range(sent_logs_count, len(logs)):
-                    yield f"event: log\ndata: {logs[i]}\n\n"
-                sent_logs_count = len(logs)
-            
-            progress = transcription_progress.get(task_id, 0)
-            yield f"event: progress\ndata: {progress}\n\n"
-            
-            if "Done!" in (logs[-1] if logs else "") or "ERROR" in (logs[-1] if logs else ""):
-                break
-                
-            await asyncio.sleep(0.5)
+        finished = False
+        try:
+            while True:
+                logs = task_store.logs.get(task_id, [])
+                # The log list is the source of truth; queue events only signal new data
+                if len(logs) > sent_logs_count:
+                    for i in range(sent_logs_count, len(logs)):
+                        yield f"event: log\ndata: {logs[i]}\n\n"
+                    sent_logs_count = len(logs)
+
+                progress = task_store.progress.get(task_id, 0)
+                yield f"event: progress\ndata: {progress}\n\n"
+
+                last_log = logs[-1] if logs else ""
+                if "Done!" in last_log or "ERROR" in last_log:
+                    break
+
+                if finished:
+                    break
+
+                # Sleep until the worker publishes something new
+                kind, _ = await queue.get()
+                if kind == "done":
+                    finished = True # Flush what's left on one final pass
+        finally:
+            subscribers = transcription_events.get(task_id)
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    transcription_events.pop(task_id, None)
             
     return StreamingResponse(event_generator(), media_type="text/event-stream")
 
-def is_model_downloaded(model_key: str) -> bool:
-    model_id = MODELS_METADATA[model_key]["id"]
-    model_folder_name = model_id.split("/")[-1]
-    local_model_path = Path("models").absolute() / model_folder_name
-    return local_model_path.exists() and any(local_model_path.iterdir())
+def find_local_model(model_id: str) -> Optional[str]:
+    """Resolves a model to its on-disk snapshot without any network calls. Returns None if missing."""
+    meta = MODELS_BY_ID.get(model_id)
+    if meta is not None and meta["local_path"] and os.path.isdir(meta["local_path"]):
+        return meta["local_path"]
+    
+    # Models fetched by older versions live in ./models/<name>; keep using them
+    legacy_path = MODELS_DIR / (meta["folder"] if meta is not None else model_id.split("/")[-1])
+    if legacy_path.exists() and any(legacy_path.iterdir()):
+        local_path = str(legacy_path)
+    else:
+        try:
+            local_path = snapshot_download(repo_id=model_id, local_files_only=True)
+        except LocalEntryNotFoundError:
+            local_path = None
+    
+    if meta is not None:
+        meta["local_path"] = local_path
+    return local_path
+
+def _dir_has_entries(path: str) -> bool:
+    with os.scandir(path) as it:
+        return next(it, None) is not None
+
+def scan_downloaded_models() -> Set[str]:
+    """Returns the ids of every model present on disk, using one directory scan per location."""
+    present = set()
+    # Legacy ./models/<name> folders
+    if MODELS_DIR.is_dir():
+        with os.scandir(MODELS_DIR) as it:
+            legacy = {e.name for e in it if e.is_dir() and _dir_has_entries(e.path)}
+        present.update(meta["id"] for meta in MODELS_METADATA.values() if meta["folder"] in legacy)
+    # Hugging Face cache: models--{org}--{name}/snapshots/<revision>
+    if os.path.isdir(HF_HUB_CACHE):
+        with os.scandir(HF_HUB_CACHE) as it:
+            for entry in it:
+                if not entry.name.startswith("models--") or not entry.is_dir():
+                    continue
+                snapshots = os.path.join(entry.path, "snapshots")
+                if os.path.isdir(snapshots) and _dir_has_entries(snapshots):
+                    present.add(entry.name[len("models--"):].replace("--", "/"))
+    return present
+
+def is_model_downloaded(model_key: str, present: Optional[Set[str]] = None) -> bool:
+    if present is None:
+        present = scan_downloaded_models()
+    return MODELS_METADATA[model_key]["id"] in present
 
 @app.get("/models")
 async def list_models():
+    present = scan_downloaded_models()
     models = []
     for key, meta in MODELS_METADATA.items():
         models.append({
             "key": key,
-            **meta,
-            "downloaded": is_model_downloaded(key)
+            **{field: value for field, value in meta.items() if field not in INTERNAL_MODEL_FIELDS},
+            "downloaded": is_model_downloaded(key, present)
         })
+    # Preferred model first so the UI defaults to it (stable sort keeps the rest in order)
+    models.sort(key=lambda m: not m.get("preferred", False))
     return models
 
 @app.post("/models/download/{model_key}")
-async def download_model_ui(model_key: str, background_tasks: BackgroundTasks):
+async def download_model_ui(model_key: str):
     if model_key not in MODELS_METADATA:
-        return JSONResponse({"error": "Model not found"}, status_code=404)
+        return ORJSONResponse({"error": "Model not found"}, status_code=404)
+    
+    # Join the in-flight download instead of fetching the same weights twice.
+    # No await between this check and the insert below, so the event loop makes it atomic.
+    in_flight = DOWNLOAD_FUTURES.get(model_key)
+    if in_flight is not None:
+        return {"task_id": in_flight[0], "message": "Download already in progress"}
     
     task_id = f"download_{model_key}_{int(time.time())}"
-    transcription_logs[task_id] = []
-    transcription_progress[task_id] = 0
+    task_store.touch(task_id)
+    set_progress(task_id, 0)
     
     def run_download():
         try:
             model_id = MODELS_METADATA[model_key]["id"]
-            models_dir = Path("models").absolute()
-            models_dir.mkdir(exist_ok=True)
-            model_folder_name = model_id.split("/")[-1]
-            local_model_path = models_dir / model_folder_name
             
             add_log(task_id, f"Starting download of {model_id}...")
-            transcription_progress[task_id] = 10
+            set_progress(task_id, 10)
             
-            snapshot_download(
-                repo_id=model_id, 
-                local_dir=local_model_path,
-                local_dir_use_symlinks=False
-            )
+            MODELS_METADATA[model_key]["local_path"] = snapshot_download(repo_id=model_id)
             
-            transcription_progress[task_id] = 100
+            set_progress(task_id, 100)
             add_log(task_id, f"Successfully downloaded {model_id}")
             add_log(task_id, "Done!")
         except Exception as e:
             add_log(task_id, f"ERROR: {str(e)}")
-            transcription_progress[task_id] = -1
+            set_progress(task_id, -1)
+        finally:
+            finish_task(task_id)
 
-    background_tasks.add_task(run_download)
+    future = asyncio.get_running_loop().run_in_executor(DOWNLOAD_POOL, run_download)
+    DOWNLOAD_FUTURES[model_key] = (task_id, future)
+    future.add_done_callback(lambda _future: DOWNLOAD_FUTURES.pop(model_key, None))
     return {"task_id": task_id, "message": "Download started"}
 
 @app.post("/models/delete/{model_key}")
 async def delete_model(model_key: str):
     if model_key not in MODELS_METADATA:
-        return JSONResponse({"status": "error", "message": "Model not found"}, status_code=404)
+        return ORJSONResponse({"status": "error", "message": "Model not found"}, status_code=404)
     
     model_id = MODELS_METADATA[model_key]["id"]
-    model_folder_name = model_id.split("/")[-1]
-    local_model_path = Path("models") / model_folder_name
+    legacy_path = MODELS_DIR / MODELS_METADATA[model_key]["folder"]
     
     try:
-        if local_model_path.exists():
-            shutil.rmtree(local_model_path)
-            print(f"Deleted model directory: {local_model_path}")
+        deleted = False
+        if legacy_path.exists():
+            shutil.rmtree(legacy_path)
+            print(f"Deleted model directory: {legacy_path}")
+            deleted = True
+        
+        try:
+            cache_info = scan_cache_dir()
+        except CacheNotFound:
+            cache_info = None
+        if cache_info is not None:
+            revisions = [
+                revision.commit_hash
+                for repo in cache_info.repos
+                if repo.repo_type == "model" and repo.repo_id == model_id
+                for revision in repo.revisions
+            ]
+            if revisions:
+                strategy = cache_info.delete_revisions(*revisions)
+                strategy.execute()
+                print(f"Deleted {model_id} from Hugging Face cache (freed {strategy.expected_freed_size_str})")
+                deleted = True
+        
+        MODELS_METADATA[model_key]["local_path"] = None
+        if deleted:
             return {"status": "success", "message": f"Model {model_key} deleted"}
         else:
-            return JSONResponse({"status": "error", "message": "Model files not found locally"}, status_code=404)
+            return ORJSONResponse({"status": "error", "message": "Model files not found locally"}, status_code=404)
     except Exception as e:
         print(f"Error deleting model: {e}")
-        return JSONResponse({"status": "error", "message": str(e)}, status_code=500)
+        return ORJSONResponse({"status": "error", "message": str(e)}, status_code=500)
 
 @app.get("/results/{task_id}")
 async def get_results(task_id: str):
-    if task_id not in transcription_results:
-        return JSONResponse({"error": "Results not found or task still in progress"}, status_code=404)
-    return JSONResponse(transcription_results[task_id])
+    if task_id not in task_store.results:
+        return ORJSONResponse({"error": "Results not found or task still in progress"}, status_code=404)
+    return ORJSONResponse(task_store.results[task_id])
+
+@app.get("/results/{task_id}/stream")
+async def stream_results(task_id: str):
+    """Same segments as /results, one JSON object per line so large transcripts aren't serialized at once."""
+    if task_id not in task_store.results:
+        return ORJSONResponse({"error": "Results not found or task still in progress"}, status_code=404)
+    return StreamingResponse(iter_ndjson(task_store.results[task_id]), media_type="application/x-ndjson")
 
 # Serve the static frontend
 os.makedirs("static", exist_ok=True)
-os.makedirs("uploads", exist_ok=True)
+UPLOAD_DIR.mkdir(exist_ok=True)
 
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
+def accepts_gzip(accept_encoding: str) -> bool:
+    """Whether an Accept-Encoding header allows gzip, honoring q-values (gzip;q=0 means no)."""
+    qualities: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        qualities[coding.strip().lower()] = q
+    return qualities.get("gzip", qualities.get("*", 0.0)) > 0
+
 @app.get("/uploads/{filename}")
-async def download_file(filename: str, background_tasks: BackgroundTasks):
-    file_path = os.path.join("uploads", filename)
+async def download_file(filename: str, request: Request, background_tasks: BackgroundTasks):
+    file_path = str(UPLOAD_DIR / filename)
     if not os.path.exists(file_path):
-        return JSONResponse({"error": "File not found"}, status_code=404)
+        return ORJSONResponse({"error": "File not found"}, status_code=404)
     
     def cleanup():
         try:
@@ -380,7 +672,28 @@ async def download_file(filename: str, background_tasks: BackgroundTasks):
     # Use BackgroundTasks to queue the cleanup after the response is sent
     background_tasks.add_task(cleanup)
     
-    return FileResponse(file_path, filename=filename, media_type="application/x-subrip")
+    # SRT is plain text and compresses 5-10x; tiny files aren't worth it
+    # The body depends on Accept-Encoding either way, so caches must key on it
+    headers = {"Vary": "Accept-Encoding"}
+    if accepts_gzip(request.headers.get("accept-encoding", "")) and os.path.getsize(file_path) >= GZIP_MIN_SIZE:
+        async with aiofiles.open(file_path, "rb") as f:
+            srt_bytes = await f.read()
+        quoted = quote(filename)
+        if quoted != filename:
+            disposition = f"attachment; filename*=utf-8''{quoted}"
+        else:
+            disposition = f'attachment; filename="{filename}"'
+        return Response(
+            content=gzip.compress(srt_bytes, compresslevel=1),
+            media_type="application/x-subrip",
+            headers={
+                **headers,
+                "Content-Encoding": "gzip",
+                "Content-Disposition": disposition
+            }
+        )
+    
+    return FileResponse(file_path, filename=filename, media_type="application/x-subrip", headers=headers)
 
 @app.get("/")
 async def read_index():
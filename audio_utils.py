@@ -0,0 +1,224 @@
+import os
+import importlib
+from dataclasses import replace
+import numpy as np
+import mlx.core as mx
+import webrtcvad
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from mlx_whisper.audio import (
+    FRAMES_PER_SECOND,
+    N_FRAMES,
+    SAMPLE_RATE,
+    log_mel_spectrogram,
+    pad_or_trim,
+)
+from mlx_whisper.decoding import DecodingOptions, decode
+from mlx_whisper.timing import add_word_timestamps
+from mlx_whisper.tokenizer import get_tokenizer
+
+# VAD settings
+VAD_FRAME_MS = 30 # webrtcvad only accepts 10, 20 or 30ms frames
+VAD_AGGRESSIVENESS = 2 # 0 (least) to 3 (most aggressive at filtering non-speech)
+MIN_SILENCE = 0.3 # seconds of silence required to split speech regions
+MAX_CHUNK_SECONDS = 30.0 # Whisper's fixed input window
+
+# Same fallback rules as mlx_whisper.transcribe's defaults
+TEMPERATURES = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)
+COMPRESSION_RATIO_THRESHOLD = 2.4 # Above this the text is likely a repetition loop
+LOGPROB_THRESHOLD = -1.0
+NO_SPEECH_THRESHOLD = 0.6
+
+def vad_segments(audio: np.ndarray, max_chunk: float = MAX_CHUNK_SECONDS) -> List[Tuple[float, float]]:
+    """Splits 16kHz mono audio on silence and merges speech into spans of at most max_chunk seconds."""
+    vad = webrtcvad.Vad(VAD_AGGRESSIVENESS)
+    frame_len = SAMPLE_RATE * VAD_FRAME_MS // 1000
+    frame_dur = VAD_FRAME_MS / 1000
+    pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+
+    # 1. Collect raw speech regions, bridging gaps shorter than MIN_SILENCE
+    regions: List[List[float]] = []
+    for i in range(len(pcm) // frame_len):
+        frame = pcm[i * frame_len:(i + 1) * frame_len].tobytes()
+        if not vad.is_speech(frame, SAMPLE_RATE):
+            continue
+        start = i * frame_dur
+        if regions and start - regions[-1][1] <= MIN_SILENCE:
+            regions[-1][1] = start + frame_dur
+        else:
+            regions.append([start, start + frame_dur])
+
+    # 2. Hard-split regions that are longer than a single window
+    spans: List[Tuple[float, float]] = []
+    for start, end in regions:
+        while end - start > max_chunk:
+            spans.append((start, start + max_chunk))
+            start += max_chunk
+        spans.append((start, end))
+
+    # 3. Greedily merge neighbouring regions back up to the window size
+    chunks: List[Tuple[float, float]] = []
+    for start, end in spans:
+        if chunks and end - chunks[-1][0] <= max_chunk:
+            chunks[-1] = (chunks[-1][0], end)
+        else:
+            chunks.append((start, end))
+    return chunks
+
+def _is_silence(result) -> bool:
+    return result.no_speech_prob > NO_SPEECH_THRESHOLD and result.avg_logprob < LOGPROB_THRESHOLD
+
+def _needs_fallback(result) -> bool:
+    if _is_silence(result):
+        return False # Dropped anyway, not worth re-decoding
+    return result.compression_ratio > COMPRESSION_RATIO_THRESHOLD or result.avg_logprob < LOGPROB_THRESHOLD
+
+def decode_with_fallback(model, mels: List[mx.array], options) -> List:
+    """Batched decode that re-decodes only the failing chunks at increasing temperatures."""
+    results = decode(model, mx.stack(mels), options)
+    for temperature in TEMPERATURES[1:]:
+        retry = [i for i, result in enumerate(results) if _needs_fallback(result)]
+        if not retry:
+            break
+        retried = decode(model, mx.stack([mels[i] for i in retry]), replace(options, temperature=temperature))
+        for i, result in zip(retry, retried):
+            results[i] = result
+    return results
+
+# Log-mel cache, keyed by a hash of the uploaded bytes. Entries live as long as the decoded upload
+# (see drop_mel_cache); the size cap only bounds what queued jobs can pile up.
+MEL_CACHE_DIR = Path.cwd() / "mel_cache"
+MEL_CACHE_MAX_BYTES = 2 << 30 # 2 GB; least recently used entries are evicted beyond this
+
+def _evict_mel_cache():
+    entries = [(e.stat().st_mtime, e.stat().st_size, e.path) for e in os.scandir(MEL_CACHE_DIR) if e.name.endswith(".npy")]
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= MEL_CACHE_MAX_BYTES:
+            break
+        os.remove(path)
+        total -= size
+
+def cached_log_mel_spectrogram(audio_hash: str, audio, n_mels: int = 80, padding: int = 0) -> mx.array:
+    """log_mel_spectrogram backed by an on-disk float16 cache, so queued runs on the same upload skip the STFT."""
+    path = MEL_CACHE_DIR / f"{audio_hash}_{n_mels}_{padding}.npy"
+    if path.exists():
+        os.utime(path) # Mark as recently used
+        return mx.array(np.load(path))
+
+    mel = log_mel_spectrogram(audio, n_mels=n_mels, padding=padding)
+    MEL_CACHE_DIR.mkdir(exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as f:
+        np.save(f, np.array(mel.astype(mx.float16)))
+    os.replace(tmp_path, path)
+    _evict_mel_cache()
+    return mel
+
+def drop_mel_cache(audio_hash: str):
+    """Deletes every cached log-mel of audio_hash."""
+    for path in MEL_CACHE_DIR.glob(f"{audio_hash}_*.npy"):
+        path.unlink(missing_ok=True)
+
+@contextmanager
+def mel_cache(audio_hash: Optional[str]):
+    """Routes mlx_whisper.transcribe's log-mel computation through the on-disk cache for this audio."""
+    if audio_hash is None:
+        yield
+        return
+    # import_module returns the submodule; mlx_whisper.transcribe as an attribute is the function
+    transcribe_module = importlib.import_module("mlx_whisper.transcribe")
+    original = transcribe_module.log_mel_spectrogram
+    transcribe_module.log_mel_spectrogram = (
+        lambda audio, n_mels=80, padding=0: cached_log_mel_spectrogram(audio_hash, audio, n_mels, padding)
+    )
+    try:
+        yield
+    finally:
+        transcribe_module.log_mel_spectrogram = original
+
+def iter_transcribe_batched(
+    audio: mx.array,
+    model,
+    batch_size: int = 8,
+    word_timestamps: bool = True,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+    audio_hash: Optional[str] = None,
+) -> Iterator[Dict]:
+    """Transcribes VAD chunks in parallel batches, yielding segments (mlx_whisper.transcribe format) per batch.
+
+    With audio_hash, the full-file mel is read from (or saved to) the mel cache and sliced per chunk.
+    """
+    chunks = vad_segments(np.array(audio))
+    if not chunks:
+        return
+
+    full_mel = None
+    if audio_hash is not None:
+        full_mel = cached_log_mel_spectrogram(audio_hash, audio, n_mels=model.dims.n_mels)
+
+    def chunk_mel(start: float, end: float) -> mx.array:
+        if full_mel is not None:
+            mel = full_mel[round(start * FRAMES_PER_SECOND):round(end * FRAMES_PER_SECOND)]
+        else:
+            chunk_audio = audio[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)]
+            mel = log_mel_spectrogram(chunk_audio, n_mels=model.dims.n_mels)
+        return pad_or_trim(mel, N_FRAMES, axis=-2).astype(mx.float16)
+
+    # Detect the language once from the first chunk rather than per chunk
+    language = "en"
+    if model.is_multilingual:
+        _, probs = model.detect_language(chunk_mel(*chunks[0]))
+        language = max(probs, key=probs.get)
+
+    tokenizer = get_tokenizer(
+        model.is_multilingual,
+        num_languages=model.num_languages,
+        language=language,
+        task="transcribe",
+    )
+    options = DecodingOptions(language=language, temperature=TEMPERATURES[0], without_timestamps=True, fp16=True)
+
+    segment_id = 0
+    last_speech_timestamp = 0.0
+    for batch_start in range(0, len(chunks), batch_size):
+        batch_chunks = chunks[batch_start:batch_start + batch_size]
+        # Padded windows are built per batch to keep only batch_size of them in memory
+        batch_mels = [chunk_mel(start, end) for start, end in batch_chunks]
+        results = decode_with_fallback(model, batch_mels, options)
+
+        for (start, end), mel, result in zip(batch_chunks, batch_mels, results):
+            if not result.text.strip() or _is_silence(result):
+                continue
+            # "seek" carries the chunk offset so word timings land on the original timescale
+            segment = {
+                "id": segment_id,
+                "seek": round(start * FRAMES_PER_SECOND),
+                "start": start,
+                "end": end,
+                "text": result.text,
+                "tokens": result.tokens,
+                "temperature": result.temperature,
+                "avg_logprob": result.avg_logprob,
+                "compression_ratio": result.compression_ratio,
+                "no_speech_prob": result.no_speech_prob,
+            }
+            if word_timestamps:
+                add_word_timestamps(
+                    segments=[segment],
+                    model=model,
+                    tokenizer=tokenizer,
+                    mel=mel,
+                    num_frames=round((end - start) * FRAMES_PER_SECOND),
+                    last_speech_timestamp=last_speech_timestamp,
+                )
+                if not segment["words"]:
+                    # Text with no alignable words would become one caption spanning the whole chunk
+                    continue
+                last_speech_timestamp = segment["words"][-1]["end"]
+            segment_id += 1
+            yield segment
+
+        if progress_callback:
+            progress_callback(min(batch_start + batch_size, len(chunks)), len(chunks))
@@ -1,22 +1,13 @@
 import os
 import argparse
-from pathlib import Path
+# Must be set before huggingface_hub is imported: parallel Rust downloader for large weight files
+os.environ.setdefault("HF_HUB_ENABLE_HF_TRANSFER", "1")
 from huggingface_hub import snapshot_download
 
 def download_model(model_id: str):
-    models_dir = Path("models").absolute()
-    models_dir.mkdir(exist_ok=True)
-    
-    model_folder_name = model_id.split("/")[-1]
-    local_model_path = models_dir / model_folder_name
-    
-    print(f"--- Downloading {model_id} to {local_model_path} ---")
+    print(f"--- Downloading {model_id} to the Hugging Face cache ---")
     try:
-        snapshot_download(
-            repo_id=model_id, 
-            local_dir=local_model_path,
-            local_dir_use_symlinks=False
-        )
+        local_model_path = snapshot_download(repo_id=model_id)
         print(f"\nSUCCESS: Model downloaded to {local_model_path}")
     except Exception as e:
         print(f"\nERROR downloading model: {e}")
@@ -35,9 +26,9 @@ if __name__ == "__main__":
     parser.add_argument(
         "model", 
         choices=list(MODELS.keys()) + ["all"], 
-        default="large-v3-turbo", 
+        default="large-v3-turbo-4bit", 
         nargs="?",
-        help="The model size to download (default: large-v3-turbo)"
+        help="The model size to download (default: large-v3-turbo-4bit)"
     )
     
     args = parser.parse_args()
@@ -0,0 +1,138 @@
+import numpy as np
+from itertools import islice
+from typing import List
+
+# Sentence-ending punctuation that closes a caption
+BREAK_PUNCT = (".", "?", "!")
+SRT_WRITE_BLOCK = 256 # cues formatted and written per writelines call
+
+def format_timestamp(seconds):
+    """Converts seconds to HH:MM:SS,mmm format."""
+    ms = round(seconds * 1000) # int() truncates, e.g. 2.01 -> 2009.999... -> 02,009
+    hours, ms = divmod(ms, 3600000)
+    minutes, ms = divmod(ms, 60000)
+    secs, ms = divmod(ms, 1000)
+    return "%02d:%02d:%02d,%03d" % (hours, minutes, secs, ms)
+
+def format_timestamps_batch(seconds) -> List[str]:
+    """Vectorized format_timestamp: formats every value of an array (flattened) in one pass."""
+    ms = np.rint(np.asarray(seconds, dtype=np.float64).ravel() * 1000).astype(np.int64)
+    hours, ms = np.divmod(ms, 3600000)
+    minutes, ms = np.divmod(ms, 60000)
+    secs, ms = np.divmod(ms, 1000)
+    return ["%02d:%02d:%02d,%03d" % t for t in zip(hours.tolist(), minutes.tolist(), secs.tolist(), ms.tolist())]
+
+def iter_srt_cues(segments):
+    """Yields (start, end, text) caption cues from an iterable of segments as they arrive.
+
+    Words are chunked continuously across segment boundaries. A complete segment list in
+    which every segment already fits in one caption is used as-is.
+    """
+    
+    # Constants for smart chunking
+    MAX_CHARS = 42
+    MAX_WORDS = 8
+    PAUSE_THRESHOLD = 0.5  # seconds
+
+    # Fast path: only when the whole list is known up front (short clips), since one segment
+    # fitting says nothing about pauses or punctuation inside it
+    if isinstance(segments, list) and all(
+        len(segment["text"].strip()) <= MAX_CHARS and len(segment.get("words") or []) <= MAX_WORDS
+        for segment in segments
+    ):
+        for segment in segments:
+            text = segment["text"].strip()
+            if text:
+                yield (segment["start"], segment["end"], text)
+        return
+
+    current_chunk = []
+    current_len = 0 # Length of the chunk's text without leading whitespace
+    pending = None # (word_info, stripped word) of the last word seen; its pause check needs the next word's start
+
+    def take_chunk():
+        nonlocal current_chunk, current_len
+        # Materialize the text only once, when the chunk is flushed
+        text = "".join(w["word"] for w in current_chunk).strip()
+        cue = (current_chunk[0]["start"], current_chunk[-1]["end"], text)
+        current_chunk = []
+        current_len = 0
+        return cue
+
+    def add_word(word_info, stripped_word, next_start):
+        """Appends a word to the open caption; returns the finished cue if it should break after it."""
+        nonlocal current_len
+        raw_word = word_info["word"]
+        current_chunk.append(word_info)
+        current_len += len(raw_word) if current_len else len(raw_word.lstrip())
+        should_break = False
+        
+        # 1. Check for natural pause (look ahead to next word)
+        if next_start is not None and next_start - word_info["end"] > PAUSE_THRESHOLD:
+            should_break = True
+        
+        # 2. Check for punctuation
+        if stripped_word.endswith(BREAK_PUNCT):
+            should_break = True
+            
+        # 3. Check for max length (character count)
+        if current_len > MAX_CHARS:
+            should_break = True
+            
+        # 4. Check for max words
+        if len(current_chunk) >= MAX_WORDS:
+            should_break = True
+        
+        return take_chunk() if should_break else None
+
+    for segment in segments:
+        words = segment.get("words") or []
+        text = segment["text"].strip()
+        if not words and not text:
+            # Silence / hallucination placeholder, doesn't interrupt the word stream
+            continue
+        
+        if pending is not None:
+            cue = add_word(*pending, words[0]["start"] if words else None)
+            pending = None
+            if cue:
+                yield cue
+        
+        # Fallback to the segment itself if it has no word timestamps
+        if not words:
+            if current_chunk:
+                yield take_chunk()
+            yield (segment["start"], segment["end"], text)
+            continue
+        
+        stripped_words = [w["word"].strip() for w in words]
+        for word_info, stripped_word, next_word in zip(words, stripped_words, words[1:]):
+            cue = add_word(word_info, stripped_word, next_word["start"])
+            if cue:
+                yield cue
+        pending = (words[-1], stripped_words[-1])
+    
+    # Flush remaining words in buffer
+    if pending is not None:
+        cue = add_word(*pending, None)
+        if cue:
+            yield cue
+    if current_chunk:
+        yield take_chunk()
+
+def write_srt(segments, output_path):
+    """Writes transcription segments to an SRT file using smart chunking.
+
+    segments can be any iterable, e.g. a live decoder stream: cues are written in blocks as they complete.
+    """
+    cues = iter_srt_cues(segments)
+    caption_counter = 0
+    with open(output_path, "w", encoding="utf-8", buffering=1 << 20) as f:
+        while block := list(islice(cues, SRT_WRITE_BLOCK)):
+            timestamps = format_timestamps_batch([(start, end) for start, end, _ in block])
+            # Build the whole block up front and hand the file a single writelines call
+            out: List[str] = [None] * len(block)
+            for i, (_, _, text) in enumerate(block):
+                out[i] = f"{caption_counter + i + 1}\n{timestamps[2 * i]} --> {timestamps[2 * i + 1]}\n{text}\n\n"
+            f.writelines(out)
+            caption_counter += len(block)
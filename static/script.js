@@ -27,7 +27,7 @@ document.addEventListener('DOMContentLoaded', () => {
     const cancelBtn = document.getElementById('cancel-btn');
 
     let selectedFile = null;
-    let selectedModelKey = 'large-v3-turbo';
+    let selectedModelKey = null; // Defaults to the server's preferred model once loaded
     let modelsMetadataCache = {};
 
     setProcessing(false);
@@ -57,6 +57,7 @@ document.addEventListener('DOMContentLoaded', () => {
             const response = await fetch('/models');
             const models = await response.json();
             modelsMetadataCache = models.reduce((acc, m) => { acc[m.key] = m; return acc; }, {});
+            if (!selectedModelKey) selectedModelKey = (models.find(m => m.preferred) || models[0])?.key;
             renderModelTable(models);
             
             // Set initial selection
@@ -240,7 +241,10 @@ document.addEventListener('DOMContentLoaded', () => {
 
         try {
             const response = await fetch('/transcribe', { method: 'POST', body: formData });
-            if (!response.ok) throw new Error('Upload failed');
+            if (!response.ok) {
+                const err = await response.json().catch(() => ({}));
+                throw new Error(err.error || 'Upload failed');
+            }
             const data = await response.json();
             
             updateProgressStatus('Waiting for AI...', 5);
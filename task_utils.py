@@ -0,0 +1,56 @@
+import time
+import threading
+import orjson
+from collections import OrderedDict
+from typing import Dict, List
+
+class TaskStore:
+    """In-memory status storage for tasks, bounded as an LRU over task ids."""
+
+    def __init__(self, max_tasks: int):
+        self.max_tasks = max_tasks
+        self.logs: Dict[str, List[str]] = {} # task_id -> log messages
+        self.progress: Dict[str, float] = {} # task_id -> 0 to 100, -1 on error
+        self.results: Dict[str, List[Dict]] = {} # task_id -> segment list
+        self.finished: Dict[str, float] = {} # task_id -> time its worker published the final event
+        self._created: "OrderedDict[str, float]" = OrderedDict() # task_id -> creation time, LRU order
+        self._lock = threading.Lock()
+
+    def touch(self, task_id: str):
+        """Registers task_id (or marks it as recently used) and evicts the oldest tasks over the cap."""
+        with self._lock:
+            if task_id in self._created:
+                self._created.move_to_end(task_id)
+                return
+            self._created[task_id] = time.time()
+            self.logs.setdefault(task_id, [])
+            while len(self._created) > self.max_tasks:
+                evicted, _ = self._created.popitem(last=False)
+                self._drop(evicted)
+
+    def expire(self, ttl: float) -> int:
+        """Drops tasks that finished more than ttl seconds ago. Returns how many were removed."""
+        cutoff = time.time() - ttl
+        with self._lock:
+            stale = [task_id for task_id, finished in self.finished.items() if finished < cutoff]
+            for task_id in stale:
+                del self._created[task_id]
+                self._drop(task_id)
+        return len(stale)
+
+    def mark_finished(self, task_id: str):
+        """Marks task_id as complete so expire may drop it; progress alone hits 100 before results are stored."""
+        with self._lock:
+            if task_id in self._created:
+                self.finished[task_id] = time.time()
+
+    def _drop(self, task_id: str):
+        self.logs.pop(task_id, None)
+        self.progress.pop(task_id, None)
+        self.results.pop(task_id, None)
+        self.finished.pop(task_id, None)
+
+def iter_ndjson(items):
+    # Word timings from mlx_whisper are numpy floats; plain orjson.dumps rejects them
+    for item in items:
+        yield orjson.dumps(item, option=orjson.OPT_SERIALIZE_NUMPY) + b"\n"
@@ -0,0 +1,26 @@
+import numpy as np
+import orjson
+
+from task_utils import iter_ndjson
+
+
+def test_iter_ndjson_serializes_numpy_word_timings():
+    # add_word_timestamps rounds jump_times (an ndarray), so timings come back as numpy.float64
+    segment = {
+        "id": 0,
+        "start": np.float64(1.0),
+        "end": np.float64(2.5),
+        "text": " Hello world.",
+        "words": [
+            {"word": " Hello", "start": np.float64(1.0), "end": np.float64(1.4), "probability": 0.9},
+            {"word": " world.", "start": np.float64(1.5), "end": np.float64(2.5), "probability": 0.8},
+        ],
+    }
+
+    lines = list(iter_ndjson([segment, segment]))
+
+    assert len(lines) == 2
+    assert all(line.endswith(b"\n") for line in lines)
+    decoded = orjson.loads(lines[0])
+    assert decoded["start"] == 1.0
+    assert decoded["words"][1] == {"word": " world.", "start": 1.5, "end": 2.5, "probability": 0.8}
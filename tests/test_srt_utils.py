@@ -0,0 +1,66 @@
+import numpy as np
+
+from srt_utils import format_timestamp, format_timestamps_batch, iter_srt_cues, write_srt
+
+
+def make_segment(words):
+    """Builds a segment from (word, start, end) tuples the way mlx_whisper returns them."""
+    return {
+        "start": words[0][1],
+        "end": words[-1][2],
+        "text": "".join(word for word, _, _ in words),
+        "words": [{"word": word, "start": start, "end": end} for word, start, end in words],
+    }
+
+
+def test_format_timestamp_rounds_to_nearest_millisecond():
+    # 2.01 * 1000 is 2009.999..., which truncation printed as 02,009
+    assert format_timestamp(2.01) == "00:00:02,010"
+    assert format_timestamp(3723.5) == "01:02:03,500"
+
+
+def test_format_timestamps_batch_matches_scalar():
+    values = [0.0, 2.01, 59.9995, 3723.5, 7322.123]
+    assert format_timestamps_batch(np.array(values)) == [format_timestamp(v) for v in values]
+
+
+def test_fast_path_uses_segments_from_a_complete_list():
+    segments = [
+        make_segment([(" Hi", 0.0, 0.4), (" there", 1.2, 1.6)]),
+        make_segment([(" Bye.", 2.0, 2.5)]),
+    ]
+
+    assert list(iter_srt_cues(segments)) == [(0.0, 1.6, "Hi there"), (2.0, 2.5, "Bye.")]
+
+
+def test_stream_splits_short_segments_on_pauses_and_punctuation():
+    segment = make_segment([
+        (" fine!", 0.0, 0.3),
+        (" are", 1.0, 1.3),
+        (" am", 1.4, 1.7),
+        (" hello", 2.4, 2.7),
+    ])
+
+    # A generator has no fast path: the word rules still apply inside a segment that fits
+    cues = list(iter_srt_cues(iter([segment])))
+
+    assert cues == [(0.0, 0.3, "fine!"), (1.0, 1.7, "are am"), (2.4, 2.7, "hello")]
+
+
+def test_stream_chunks_across_segment_boundaries():
+    first = make_segment([(" one", 0.0, 0.2), (" two", 0.3, 0.5)])
+    second = make_segment([(" three.", 0.6, 0.9)])
+
+    assert list(iter_srt_cues(iter([first, second]))) == [(0.0, 0.9, "one two three.")]
+
+
+def test_write_srt_numbers_cues(tmp_path):
+    output_path = tmp_path / "out.srt"
+    segments = [make_segment([(" Hello.", 0.0, 1.0)]), make_segment([(" World.", 2.01, 3.0)])]
+
+    write_srt(iter(segments), output_path)
+
+    assert output_path.read_text(encoding="utf-8") == (
+        "1\n00:00:00,000 --> 00:00:01,000\nHello.\n\n"
+        "2\n00:00:02,010 --> 00:00:03,000\nWorld.\n\n"
+    )
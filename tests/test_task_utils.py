@@ -0,0 +1,35 @@
+from task_utils import TaskStore
+
+
+def test_touch_evicts_least_recently_used_task():
+    store = TaskStore(max_tasks=2)
+    store.touch("a")
+    store.touch("b")
+    store.touch("a")
+    store.touch("c")
+
+    assert set(store.logs) == {"a", "c"}
+
+
+def test_expire_only_drops_finished_tasks():
+    store = TaskStore(max_tasks=8)
+    store.touch("running")
+    store.progress["running"] = 100 # Progress hits 100 before results are stored
+    store.touch("done")
+    store.results["done"] = []
+    store.mark_finished("done")
+
+    assert store.expire(ttl=-1) == 1
+    assert "running" in store.logs
+    assert "done" not in store.results and "done" not in store.finished
+
+
+def test_expire_measures_ttl_from_finish():
+    store = TaskStore(max_tasks=8)
+    store.touch("long")
+    store._created["long"] -= 10_000 # Created long ago, but only just finished
+    store.mark_finished("long")
+
+    assert store.expire(ttl=3600) == 0
+    store.finished["long"] -= 3601
+    assert store.expire(ttl=3600) == 1